@@ -6,12 +6,92 @@ Generate appstore.json from apps directory structure
 import json
 import os
 import yaml
+try:
+    # LibYAML binding is ~10-30x faster than the pure-Python loader
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import time
 import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Any
 
+# Compiled once; bound method avoids the re-module cache lookup per entry
+_VERSION_RE = re.compile(r'^v?\d+[-._]\d+').match
+_VERSION_ALIASES = frozenset({'latest', 'stable'})
+_VERSION_SPLIT = re.compile(r'[-._]').split
+
+def _version_key(name: str):
+    """Numeric sort key for version directory names
+
+    Lexicographic sort puts '1-10-0' before '1-2-0'; comparing tuples of
+    ints orders them correctly. Non-numeric parts (e.g. 'latest', an
+    '-alpine' suffix) sort as -1.
+    """
+    return tuple(int(p) if p.isdigit() else -1 for p in _VERSION_SPLIT(name.lstrip('v')))
+
+@dataclass(slots=True)
+class FileInfo:
+    """Per-file record; slots avoid a dict per instance and orjson
+    serializes dataclasses natively"""
+    name: str
+    size: int
+    lastModified: str
+
+def format_timestamp(mtime: float) -> str:
+    """Format a UNIX timestamp as an ISO-8601 UTC string"""
+    dt = datetime.fromtimestamp(mtime, tz=timezone.utc)
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
+            f"T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}.000+00:00")
+
+# additionalProperties carries the same fixed 14-key schema for every
+# app, so a writer specialized to that key order is generated once at
+# import time. It emits the key bytes as constants and only dispatches
+# into the JSON encoder for the values, skipping per-key dict iteration.
+_ADDPROPS_KEYS = (
+    "key", "name", "tags", "shortDescZh", "shortDescEn", "description",
+    "type", "crossVersionUpdate", "limit", "recommend", "website",
+    "github", "document", "architectures",
+)
+
+def _build_addprops_writer():
+    if orjson is not None:
+        dumps = orjson.dumps
+    else:
+        dumps = lambda obj: json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    parts = []
+    for i, key in enumerate(_ADDPROPS_KEYS):
+        sep = '{' if i == 0 else ','
+        parts.append(f"b'{sep}\"{key}\":' + dumps(md['{key}'])")
+    source = ("def _dump_addprops(md):\n"
+              "    return (" + "\n            + ".join(parts) + "\n"
+              "            + b'}')\n")
+    namespace = {'dumps': dumps}
+    exec(source, namespace)
+    return namespace['_dump_addprops']
+
+_dump_addprops = _build_addprops_writer()
+
+def _read_small(path, size: int) -> bytes:
+    """Read a small file whose size is already known from scandir
+
+    A bare open/read/close skips the buffered-IO stack and the fstat
+    that open() would otherwise issue to size its buffer.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
 class AppStoreGenerator:
     def __init__(self, github_repo: str = ""):
         # Get GitHub repo from environment or use default
@@ -19,17 +99,10 @@ class AppStoreGenerator:
         self.base_url = f"https://raw.githubusercontent.com/{self.github_repo}/main"
         self.apps_dir = Path("apps")
         self.output_file = Path("appstore.json")
+        self.cache_dir = Path(".cache/appstore")
+        # Single "now" for the whole run; refreshed at the start of generate()
+        self._now = int(time.time())
         
-    def get_file_info(self, file_path: Path) -> Dict[str, Any]:
-        """Get file information including size and last modified time"""
-        stat = file_path.stat()
-        return {
-            "name": file_path.name,
-            "size": stat.st_size,
-            "lastModified": time.strftime("%Y-%m-%dT%H:%M:%S.000+00:00", 
-                                         time.gmtime(stat.st_mtime))
-        }
-    
     def parse_version(self, version_dir: str) -> str:
         """Convert directory name to version string (e.g., '1-26-0' to '1.26.0')"""
         # Handle various version formats
@@ -39,48 +112,49 @@ class AppStoreGenerator:
             return version_dir.replace('_', '.')
         return version_dir
     
-    def get_app_metadata(self, app_dir: Path) -> Dict[str, Any]:
-        """Extract metadata from app directory"""
+    def get_app_metadata(self, app_dir: Path, entry_sizes: Dict[str, int],
+                         app_base: str) -> Dict[str, Any]:
+        """Extract metadata from app directory
+
+        entry_sizes maps the names already listed from app_dir to their
+        sizes, so presence checks are dict lookups instead of stat
+        syscalls and reads are sized up front.
+        app_base is the precomputed raw-content URL for the app.
+        """
         metadata = {}
-        
+
         # Check for metadata.yml or metadata.json
-        metadata_yml = app_dir / "metadata.yml"
-        metadata_json = app_dir / "metadata.json"
-        
-        if metadata_yml.exists():
-            with open(metadata_yml, 'r', encoding='utf-8') as f:
-                metadata = yaml.safe_load(f) or {}
-        elif metadata_json.exists():
-            with open(metadata_json, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-        
+        if "metadata.yml" in entry_sizes:
+            raw = _read_small(app_dir / "metadata.yml", entry_sizes["metadata.yml"])
+            metadata = yaml.load(raw, Loader=SafeLoader) or {}
+        elif "metadata.json" in entry_sizes:
+            raw = _read_small(app_dir / "metadata.json", entry_sizes["metadata.json"])
+            metadata = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
         # Check for README.md
-        readme_path = app_dir / "README.md"
-        if readme_path.exists():
-            with open(readme_path, 'r', encoding='utf-8') as f:
-                metadata['readMe'] = f.read()
-        
+        if "README.md" in entry_sizes:
+            raw = _read_small(app_dir / "README.md", entry_sizes["README.md"])
+            metadata['readMe'] = raw.decode('utf-8')
+
         # Check for logo/icon
         for icon_name in ['logo.png', 'icon.png', 'logo.svg', 'icon.svg']:
-            icon_path = app_dir / icon_name
-            if icon_path.exists():
-                metadata['icon'] = f"{self.base_url}/apps/{app_dir.name}/{icon_name}"
+            if icon_name in entry_sizes:
+                metadata['icon'] = f"{app_base}/{icon_name}"
                 break
-        
+
         return metadata
     
-    def process_version(self, app_name: str, version_dir: Path) -> Dict[str, Any]:
-        """Process a single version directory"""
+    def process_version(self, app_base: str, api_base: str, version_dir: Path,
+                        files: List[FileInfo]) -> Dict[str, Any]:
+        """Process a single version directory
+
+        app_base/api_base are the per-app URL prefixes precomputed in
+        process_app; files is the FileInfo list from _scan_app_tree.
+        """
         version_name = self.parse_version(version_dir.name)
-        
-        # Collect all files in the version directory
-        files = []
-        for file_path in version_dir.iterdir():
-            if file_path.is_file() and not file_path.name.startswith('.'):
-                files.append(self.get_file_info(file_path))
-        
+
         # Sort files by name
-        files.sort(key=lambda x: x['name'])
+        files.sort(key=lambda x: x.name)
         
         version_data = {
             "valid": True,
@@ -88,45 +162,155 @@ class AppStoreGenerator:
             "id": version_dir.name,
             "readMe": None,
             "name": version_name,
-            "lastModified": int(time.time()),
+            "lastModified": self._now,
             "files": files,
-            "downloadUrl": f"{self.base_url}/apps/{app_name}/{version_dir.name}",
-            "downloadCallbackUrl": f"https://api.github.com/repos/{self.github_repo}/contents/apps/{app_name}/{version_dir.name}"
+            "downloadUrl": f"{app_base}/{version_dir.name}",
+            "downloadCallbackUrl": f"{api_base}/{version_dir.name}"
         }
         
         # Check for version-specific README
-        version_readme = version_dir / "README.md"
-        if version_readme.exists():
-            with open(version_readme, 'r', encoding='utf-8') as f:
-                version_data['readMe'] = f.read()
+        for f in files:
+            if f.name == 'README.md':
+                version_data['readMe'] = _read_small(version_dir / "README.md", f.size).decode('utf-8')
+                break
         
         return version_data
     
+    def _scan_app_tree(self, app_dir: Path):
+        """Single scandir pass over the app tree
+
+        Returns (sig, entry_sizes, version_dirs, files_by_dir): the max
+        st_mtime_ns cache signature, the top-level entry names mapped to
+        their sizes, the version directories, and per-directory file
+        info lists. Each directory entry is touched exactly once for
+        both the signature and the file listing.
+        """
+        sig = app_dir.stat().st_mtime_ns
+        entry_sizes = {}
+        version_dirs = []
+        files_by_dir = {}
+        stack = []
+
+        with os.scandir(app_dir) as it:
+            for entry in it:
+                st = entry.stat(follow_symlinks=False)
+                if st.st_mtime_ns > sig:
+                    sig = st.st_mtime_ns
+                entry_sizes[entry.name] = st.st_size
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'):
+                    # Check if it looks like a version directory
+                    if _VERSION_RE(entry.name) or entry.name in _VERSION_ALIASES:
+                        version_dirs.append(app_dir / entry.name)
+                    stack.append(entry.path)
+
+        # Hot loop: bind globals and methods to locals to cut per-file
+        # interpreter dispatch (thousands of iterations on large stores)
+        scandir = os.scandir
+        fmt = format_timestamp
+        push_dir = stack.append
+        while stack:
+            dir_path = stack.pop()
+            files = files_by_dir.setdefault(dir_path, [])
+            add_file = files.append
+            with scandir(dir_path) as it:
+                for entry in it:
+                    st = entry.stat(follow_symlinks=False)
+                    mtime_ns = st.st_mtime_ns
+                    if mtime_ns > sig:
+                        sig = mtime_ns
+                    if entry.is_dir(follow_symlinks=False):
+                        push_dir(entry.path)
+                    elif not entry.name.startswith('.') and entry.is_file(follow_symlinks=False):
+                        add_file(FileInfo(entry.name, st.st_size, fmt(st.st_mtime)))
+
+        return sig, entry_sizes, version_dirs, files_by_dir
+
+    def _load_cached_app(self, cache_file: Path, sig: int) -> Dict[str, Any]:
+        """Return the cached app dict if its signature matches, else None
+
+        The cached dict embeds URLs built from the repo name, so a repo
+        mismatch (fork, rename, restored cache) is treated as a miss.
+        """
+        try:
+            raw = cache_file.read_bytes()
+            cached = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except (OSError, ValueError):
+            return None
+        if cached.get('sig') == sig and cached.get('repo') == self.github_repo:
+            return cached.get('app')
+        return None
+
+    def _store_cached_app(self, cache_file: Path, sig: int, app_data: Dict[str, Any]):
+        """Write the processed app dict to the cache atomically"""
+        payload = {"sig": sig, "repo": self.github_repo, "app": app_data}
+        if orjson is not None:
+            data = orjson.dumps(payload)
+        else:
+            data = json.dumps(payload, default=asdict).encode('utf-8')
+        tmp_file = cache_file.with_suffix('.tmp')
+        try:
+            tmp_file.write_bytes(data)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass  # cache is best-effort; never fail the run over it
+
     def process_app(self, app_dir: Path) -> Dict[str, Any]:
         """Process a single app directory"""
         app_name = app_dir.name
-        metadata = self.get_app_metadata(app_dir)
-        
+
+        # One pass gathers the cache signature, metadata/icon lookup
+        # names, version directories, and per-version file lists
+        sig, entry_sizes, version_dirs, files_by_dir = self._scan_app_tree(app_dir)
+
+        # Reuse the cached result when nothing under the app tree changed
+        cache_file = self.cache_dir / f"{app_name}.json"
+        app_data = self._load_cached_app(cache_file, sig)
+        if app_data is not None:
+            return app_data
+
+        # Per-app URL prefixes, shared by the icon default and every version
+        app_base = f"{self.base_url}/apps/{app_name}"
+        api_base = f"https://api.github.com/repos/{self.github_repo}/contents/apps/{app_name}"
+
+        metadata = self.get_app_metadata(app_dir, entry_sizes, app_base)
+
+        # Hoist repeatedly-read fields into locals so each dict key is
+        # hashed and looked up once instead of per reference below.
+        # Defaults (title-casing, placeholder strings) are only built
+        # when the corresponding metadata field is actually missing.
+        tags = metadata.get('tags', [])
+        desc = metadata.get('description', '')
+        if 'name' in metadata and 'title' in metadata and 'readMe' in metadata:
+            title_cased = None
+        else:
+            title_cased = app_name.title()
+        name = metadata['name'] if 'name' in metadata else title_cased
+        title = metadata['title'] if 'title' in metadata else title_cased
+        read_me = (metadata['readMe'] if 'readMe' in metadata
+                   else f"# {title_cased}\n\nDescription for {app_name}...")
+        description = (metadata['description'] if 'description' in metadata
+                       else f"Description for {app_name}")
+
         # Default values
         app_data = {
             "valid": True,
             "violations": [],
             "id": app_name,
-            "lastModified": int(time.time()),
-            "icon": metadata.get('icon', f"{self.base_url}/apps/{app_name}/logo.png"),
-            "readMe": metadata.get('readMe', f"# {app_name.title()}\n\nDescription for {app_name}..."),
-            "description": metadata.get('description', f"Description for {app_name}"),
-            "name": metadata.get('name', app_name.title()),
-            "tags": metadata.get('tags', []),
-            "title": metadata.get('title', app_name.title()),
+            "lastModified": self._now,
+            "icon": metadata.get('icon', f"{app_base}/logo.png"),
+            "readMe": read_me,
+            "description": description,
+            "name": name,
+            "tags": tags,
+            "title": title,
             "additionalProperties": {
                 "key": app_name,
-                "name": metadata.get('name', app_name.title()),
-                "tags": metadata.get('tags', []),
+                "name": name,
+                "tags": tags,
                 "shortDescZh": metadata.get('shortDescZh', ''),
-                "shortDescEn": metadata.get('shortDescEn', metadata.get('description', '')),
+                "shortDescEn": metadata.get('shortDescEn', desc),
                 "description": metadata.get('descriptions', {
-                    "en": metadata.get('description', ''),
+                    "en": desc,
                     "zh": metadata.get('descriptionZh', '')
                 }),
                 "type": metadata.get('type', 'runtime'),
@@ -141,69 +325,112 @@ class AppStoreGenerator:
             "versions": []
         }
         
-        # Process version directories
-        version_dirs = []
-        for item in app_dir.iterdir():
-            if item.is_dir() and not item.name.startswith('.'):
-                # Check if it looks like a version directory
-                if re.match(r'^v?\d+[-._]\d+', item.name) or item.name in ['latest', 'stable']:
-                    version_dirs.append(item)
-        
-        # Sort versions
-        version_dirs.sort(key=lambda x: x.name, reverse=True)
+        # Sort versions, newest first by numeric components
+        # The name tiebreaker keeps order deterministic when numeric keys
+        # tie (e.g. '5.7-master' vs '5.7-slave' both parse to (5, 7, -1))
+        version_dirs.sort(key=lambda x: (_version_key(x.name), x.name), reverse=True)
         
         # Process each version
         for version_dir in version_dirs:
-            version_data = self.process_version(app_name, version_dir)
+            version_data = self.process_version(
+                app_base, api_base, version_dir, files_by_dir.get(str(version_dir), []))
             app_data['versions'].append(version_data)
-        
+
+        self._store_cached_app(cache_file, sig, app_data)
         return app_data
-    
+
+    def _safe_process_app(self, app_dir: Path) -> Dict[str, Any]:
+        """Process an app directory, returning None instead of raising on failure"""
+        try:
+            print(f"Processing app: {app_dir.name}")
+            return self.process_app(app_dir)
+        except Exception as e:
+            print(f"Error processing {app_dir.name}: {e}")
+            return None
+
     def generate(self):
         """Generate the complete appstore.json"""
-        store_data = {
+        self._now = int(time.time())
+        store_header = {
             "valid": True,
             "violations": [],
             "id": "corapanel",
             "icon": "https://cdn-icons-png.flaticon.com/512/4187/4187336.png",
-            "lastModified": int(time.time()),
+            "lastModified": self._now,
             "name": "CoraPANEL",
             "title": "Official Appstore for CoraPANEL",
             "extra": {
                 "version": "v1.0.0"
-            },
-            "apps": []
+            }
         }
-        
+
         # Check if apps directory exists
         if not self.apps_dir.exists():
             print(f"Warning: {self.apps_dir} directory not found. Creating empty appstore.json")
-            self.save(store_data)
+            self.save(store_header, ())
             return
-        
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
         # Process each app directory
-        app_dirs = [d for d in self.apps_dir.iterdir() 
-                   if d.is_dir() and not d.name.startswith('.')]
+        with os.scandir(self.apps_dir) as it:
+            app_dirs = [self.apps_dir / entry.name for entry in it
+                        if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.')]
         app_dirs.sort(key=lambda x: x.name)
-        
-        for app_dir in app_dirs:
+
+        # The work is stat/IO-bound, so overlap filesystem latency across apps.
+        # AppStoreGenerator state is read-only after __init__, so no locking
+        # needed. executor.map yields in submission order, and app_dirs is
+        # already sorted by name (== app id), so results stream out sorted
+        # without holding the whole store in memory.
+        with ThreadPoolExecutor(max_workers=min(32, len(app_dirs) or 1)) as executor:
+            results = executor.map(self._safe_process_app, app_dirs)
+            count = self.save(store_header,
+                              (app_data for app_data in results if app_data is not None))
+
+        print(f"Generated {self.output_file} with {count} apps")
+
+    def save(self, header: Dict[str, Any], apps) -> int:
+        """Stream the store to appstore.json, one app at a time
+
+        header is the store dict without its apps list; apps is any
+        iterable of app dicts. Serializing per app keeps peak memory at
+        one app's data instead of the whole store.
+        """
+        if orjson is not None:
+            dumps = orjson.dumps
+        else:
+            dumps = lambda obj: json.dumps(obj, ensure_ascii=False, default=asdict).encode('utf-8')
+        head = dumps(header)
+        count = 0
+        with open(self.output_file, 'wb') as f:
+            # Reopen the header object and append the apps array
+            f.write(head[:-1] + b',"apps":[')
+            for app_data in apps:
+                if count:
+                    f.write(b',')
+                f.write(self._dump_app(app_data, dumps))
+                count += 1
+            f.write(b']}')
+        return count
+
+    @staticmethod
+    def _dump_app(app_data: Dict[str, Any], dumps) -> bytes:
+        """Serialize one app dict, routing additionalProperties through
+        the schema-specialized writer when it matches the fixed shape"""
+        props = app_data.pop('additionalProperties', None)
+        if props is None:
+            return dumps(app_data)
+        body = dumps(app_data)
+        if len(props) == len(_ADDPROPS_KEYS):
             try:
-                print(f"Processing app: {app_dir.name}")
-                app_data = self.process_app(app_dir)
-                store_data['apps'].append(app_data)
-            except Exception as e:
-                print(f"Error processing {app_dir.name}: {e}")
-                continue
-        
-        # Save the generated JSON
-        self.save(store_data)
-        print(f"Generated {self.output_file} with {len(store_data['apps'])} apps")
-    
-    def save(self, data: Dict[str, Any]):
-        """Save the generated data to appstore.json"""
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            # Save with proper formatting first (for debugging if needed)
-            json.dump(data, f, indent=2, ensure_ascii=False)
+                props_bytes = _dump_addprops(props)
+            except KeyError:
+                props_bytes = dumps(props)
+        else:
+            props_bytes = dumps(props)
+        # Splice the subtree back in before the closing brace
+        return body[:-1] + b',"additionalProperties":' + props_bytes + b'}'
 
 def main():
     # GitHub repository is automatically available in GitHub Actions as GITHUB_REPOSITORY